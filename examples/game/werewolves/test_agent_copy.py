@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=protected-access
+"""agent copy.py 中 PlayerAgent 的游戏信息解析与状态管理测试"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from collections import deque
+from typing import Any
+
+import pytest
+
+from agentscope.message import Msg
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# agent copy.py 从同目录导入 model_config
+sys.path.insert(0, _HERE)
+
+# 文件名含空格，无法直接 import，按路径加载
+_spec = importlib.util.spec_from_file_location(
+    "agent_copy",
+    os.path.join(_HERE, "agent copy.py"),
+)
+assert _spec is not None and _spec.loader is not None
+agent_copy = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(agent_copy)
+PlayerAgent = agent_copy.PlayerAgent
+
+PLAYERS = ", ".join(f"Player{i}" for i in range(1, 10))
+GAME_START = f"A new game is starting, the players are: {PLAYERS}."
+NIGHT = "Night has fallen, everyone close your eyes."
+DAY = "The day is coming, all players open your eyes."
+
+
+def _observe(agent: Any, *messages: tuple[str, str]) -> None:
+    """让 agent 依次观察 (发言者, 内容) 消息"""
+
+    async def run() -> None:
+        for speaker, content in messages:
+            await agent.observe(Msg(speaker, content, "user"))
+
+    asyncio.run(run())
+
+
+def _day_one_agent() -> Any:
+    """返回已进入第一天白天的 Player1"""
+    agent = PlayerAgent(name="Player1")
+    _observe(
+        agent,
+        ("Moderator", GAME_START),
+        ("Moderator", NIGHT),
+        ("Moderator", DAY),
+    )
+    return agent
+
+
+def test_vote_coordination_raises_suspicion() -> None:
+    """两人以上投给低怀疑度目标时，每位投票者的怀疑度上升"""
+    agent = _day_one_agent()
+    _observe(agent, ("Player2", "I vote Player5"))
+    assert agent.suspicions.get("Player2", 0.0) == 0.0
+
+    _observe(agent, ("Player3", "I vote Player5"))
+    assert agent.suspicions["Player2"] == pytest.approx(0.1)
+    assert agent.suspicions["Player3"] == pytest.approx(0.1)
+
+    _observe(agent, ("Player4", "I vote Player5"))
+    assert agent.suspicions["Player2"] == pytest.approx(0.2)
+    assert agent.suspicions["Player3"] == pytest.approx(0.2)
+    assert agent.suspicions["Player4"] == pytest.approx(0.1)
+
+
+def test_seer_credibility_follows_game_state() -> None:
+    """预言家可信度的缓存随对跳、查杀和死亡信息刷新"""
+    agent = _day_one_agent()
+    _observe(
+        agent,
+        ("Player2", "I am seer. I checked Player6, the result is werewolf."),
+    )
+    first = agent._evaluate_seer_credibility("Player2")
+    assert first == pytest.approx(agent._compute_seer_credibility("Player2"))
+
+    _observe(
+        agent,
+        ("Player8", "I am seer. I checked Player2, the result is werewolf."),
+    )
+    second = agent._evaluate_seer_credibility("Player2")
+    # 对跳并被查杀：-0.1 与 -0.2
+    assert second == pytest.approx(first - 0.3)
+
+    _observe(
+        agent,
+        ("Moderator", NIGHT),
+        ("Moderator", f"{DAY} Last night, Player6 has been eliminated."),
+    )
+    # 死亡会改变座位索引，只校验缓存值与重新计算的结果一致
+    third = agent._evaluate_seer_credibility("Player2")
+    assert third == pytest.approx(agent._compute_seer_credibility("Player2"))
+    assert agent._evaluate_seer_credibility("Player5") == 0.0
+
+
+def test_role_and_claim_parsing() -> None:
+    """身份公告与身份声明按角色名记录，中文声明覆盖英文声明"""
+    agent = _day_one_agent()
+    _observe(agent, ("Moderator", "[Player1] Your role is witch. Player1"))
+    assert agent.role == "witch"
+    assert agent.known_roles["Player1"] == "witch"
+
+    _observe(
+        agent,
+        ("Player2", "I am villager, trust me."),
+        ("Player3", "我是预言家，昨晚查验了Player5。"),
+        ("Player4", "I'm hunter... 好吧，其实我是女巫。"),
+    )
+    assert dict(agent.claimed_roles) == {
+        "Player2": "villager",
+        "Player3": "seer",
+        "Player4": "witch",
+    }
+    assert list(agent.seer_claims) == ["Player3"]
+
+
+@pytest.mark.parametrize(
+    ("strategy", "speech", "expected"),
+    [
+        (
+            "confusion_injection",
+            "Who is lying? Not me.",
+            "Who is lying... X?  Not me.",
+        ),
+        ("confusion_injection", "Player3 is lying.", "Player3 is lying. X"),
+        (
+            "vote_manipulation",
+            "Hi.\nI vote Player3.\nBye.",
+            "Hi.\nI vote Player3. X\nBye.",
+        ),
+        ("vote_manipulation", "Player3 is lying.", "Player3 is lying.\nX"),
+        ("social_pressure", "Player3 is lying.", "Player3 is lying.\nX"),
+        ("role_fakeout", "Player3 is lying.", "Player3 is lying.\nX"),
+        ("false_logic", "Player3 is lying.", "Player3 is lying.\nX"),
+        ("unknown", "Player3 is lying.", "Player3 is lying. X"),
+    ],
+)
+def test_integrate_attack_content(
+    strategy: str,
+    speech: str,
+    expected: str,
+) -> None:
+    """攻击内容按策略插入到发言中，未知策略追加到末尾"""
+    agent = PlayerAgent(name="Player1")
+    result = agent._integrate_attack_content(speech, "X", strategy)
+    assert result == expected
+
+
+def test_attack_advice_names_best_and_worst() -> None:
+    """攻击建议列出成功率最高和最低的策略"""
+    agent = _day_one_agent()
+    assert agent.initialize_attack_system()
+    agent.update_attack_effectiveness("false_logic", "Player3", True)
+    agent.update_attack_effectiveness("social_pressure", "Player3", False)
+    advice = agent.get_attack_strategy_advice()
+    assert "Best strategy: false_logic (0.60" in advice
+    assert "Avoid: social_pressure (0.40" in advice
+
+
+def test_round_progression() -> None:
+    """每轮相同的主持人公告与发言都被处理，同一轮内的重复消息只处理一次"""
+    agent = PlayerAgent(name="Player1")
+    for expected_round in range(1, 4):
+        _observe(
+            agent,
+            ("Moderator", NIGHT),
+            ("Moderator", DAY),
+            ("Player2", "I vote Player3"),
+            ("Player2", "I vote Player3"),
+        )
+        assert agent.round_num == expected_round
+        assert agent.phase == "day"
+        votes = list(agent.voting_history["Player2"])
+        assert votes == ["Player3"] * expected_round
+
+
+def test_direct_assignment() -> None:
+    """直接赋值状态字段后，分析方法使用新的值"""
+    agent = PlayerAgent(name="Player1")
+    agent.role = "villager"
+    agent.initialize_attack_system()
+
+    agent.suspicions = {"Player2": 0.8, "Player3": 0.3}
+    agent.speech_patterns = {
+        "Player2": ["I'm not sure about this", "maybe we should reconsider"],
+    }
+    susceptibility = agent.analyze_target_susceptibility("Player2")
+    assert susceptibility == pytest.approx(0.6)
+
+    agent.alive_players = [f"Player{i}" for i in range(1, 10)]
+    agent.voting_history = {
+        "Player2": ["Player3", "Player4"],
+        "Player3": ["Player2"],
+    }
+    # 赋值的普通 dict 会被转换为 defaultdict，未出现的玩家按 0 计
+    agent.suspicions = {}
+    agent.suspicions["Player9"] += 0.1
+    agent._update_suspicion_from_vote("Player2", "Player5")
+
+    context = agent._build_context()
+    assert "Alive count: 9" in context
+    assert "Player2->Player3->Player4" in context
+
+    agent.alive_players = ["Player1", "Player2"]
+    assert "Alive count: 2" in agent._build_context()
+
+
+def _checkpoint_source() -> Any:
+    """返回带有学习与攻击记录的 Player1"""
+    source = PlayerAgent(name="Player1")
+    source.role = "seer"
+    source.initialize_learning_system()
+    source.initialize_attack_system()
+    source.update_strategy_weights("aggressive_voting", 0.9)
+    source.evaluate_decision_quality("vote X", "correct_wolf_eliminated")
+    source.update_attack_effectiveness("role_fakeout", "Player3", True)
+    source._record_experience(None, None)
+    return source
+
+
+def test_load_dict_checkpoint() -> None:
+    """历史记录以字典保存，字典格式的存档可以加载"""
+    source = _checkpoint_source()
+    # 手动追加的非标准记录也应原样保留
+    source.adaptation_history.append(
+        {"round": 1, "strategy": "aggressive", "outcome": "success"},
+    )
+
+    state = json.loads(json.dumps(source.state_dict()))
+    for key in ("game_history", "adaptation_history", "decision_outcomes"):
+        assert state[key], key
+        assert all(isinstance(entry, dict) for entry in state[key]), key
+
+    agent = PlayerAgent(name="Player1")
+    agent.load_state_dict(state)
+    assert isinstance(agent.game_history, deque)
+    assert agent.game_history[0].role == "seer"
+    assert agent.adaptation_history[-1] == {
+        "round": 1,
+        "strategy": "aggressive",
+        "outcome": "success",
+    }
+    assert json.loads(json.dumps(agent.state_dict())) == state
+
+
+def test_load_dict_attack_checkpoint() -> None:
+    """攻击记录以字典保存，加载后恢复为记录对象"""
+    state = json.loads(json.dumps(_checkpoint_source().state_dict()))
+    assert state["attack_history"]
+    assert all(isinstance(entry, dict) for entry in state["attack_history"])
+
+    agent = PlayerAgent(name="Player1")
+    agent.load_state_dict(state)
+    assert agent.attack_history[0].strategy == "role_fakeout"
+    assert agent.attack_history[0].success
+    assert json.loads(json.dumps(agent.state_dict())) == state
+
+
+def test_known_roles_item_assignment() -> None:
+    """按角色名修改 known_roles 时写入内部的角色编码"""
+    agent = PlayerAgent(name="Player1")
+    agent.known_roles["Player3"] = "werewolf"
+    agent.known_roles.update({"Player4": "seer"})
+    del agent.known_roles["Player3"]
+    assert dict(agent.known_roles) == {"Player4": "seer"}
+    assert agent._known_roles_i == {"Player4": agent_copy.Role.SEER}
+
+    with pytest.raises(ValueError):
+        agent.known_roles["Player5"] = "good"
+
+    restored = PlayerAgent(name="Player1")
+    restored.load_state_dict(json.loads(json.dumps(agent.state_dict())))
+    assert dict(restored.known_roles) == {"Player4": "seer"}
+
+
+def test_same_day_revote_is_recorded() -> None:
+    """主持人要求重新投票后，同样的投票再次计入投票历史"""
+    agent = _day_one_agent()
+    _observe(
+        agent,
+        ("Player2", "I vote Player3"),
+        ("Player2", "I vote Player3"),
+        ("Moderator", "It's a tie, please vote again."),
+        ("Player2", "I vote Player3"),
+    )
+    assert agent.round_num == 1
+    assert list(agent.voting_history["Player2"]) == ["Player3", "Player3"]
+
+
+def test_seer_claims_keep_counter_claim_flag() -> None:
+    """seer_claims 只读，整体赋值时同步更新对跳标记"""
+    agent = _day_one_agent()
+    _observe(agent, ("Player2", "I am seer, Player6 is a werewolf."))
+    assert agent.seer_claims == ("Player2",)
+    assert not agent._has_counter_claim
+
+    with pytest.raises(AttributeError):
+        agent.seer_claims.append("Player8")
+    agent.seer_claims = [*agent.seer_claims, "Player8"]
+    assert agent._has_counter_claim
+
+
+def test_indexed_state_is_read_only() -> None:
+    """带派生索引的状态字段只读，只能整体赋值，索引不会过期"""
+    agent = _day_one_agent()
+    _observe(agent, ("Player2", "I vote Player3"))
+
+    with pytest.raises(TypeError):
+        agent.voting_history["Player2"] = ["Player4"]
+    with pytest.raises(AttributeError):
+        agent.voting_history["Player2"].append("Player4")
+    with pytest.raises(AttributeError):
+        agent.dead_players.append("Player3")
+    with pytest.raises(TypeError):
+        agent.wolf_checks["Player2"] = "Player3"
+
+    agent.voting_history = {
+        **agent.voting_history,
+        "Player2": [*agent.voting_history["Player2"], "Player4"],
+    }
+    agent.dead_players = [*agent.dead_players, "Player4"]
+    assert agent.voting_history_set["Player2"] == {"Player3", "Player4"}
+    assert "Player4" in agent._dead
+    assert agent._alive_count == len(agent.alive_players) - 1
+
+
+def test_susceptibility_without_vote_index() -> None:
+    """state 中的投票记录缺少集合索引时，易受攻击程度仍可计算"""
+    agent = PlayerAgent(name="Player1")
+    agent.initialize_attack_system()
+    agent.state.voting_history["Player2"] = ["Player3", "Player4"]
+    assert "Player2" not in agent.voting_history_set
+    susceptibility = agent.analyze_target_susceptibility("Player2")
+
+    # 重建索引后结果相同
+    agent.voting_history = agent.voting_history
+    assert agent.analyze_target_susceptibility("Player2") == susceptibility